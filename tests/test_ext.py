@@ -71,78 +71,78 @@ languages = {
 }
 
 
-def _get_with_context(value, ctx=None):
-    if isinstance(value, dict):
-        return value.get(ctx, value)
+#: Per-language lookup tables built once at import. Translations without
+#: message contexts live in ``_plain_strings``, the ones that map contexts
+#: to translations live in ``_context_strings``.
+_plain_strings = {
+    language: {k: v for k, v in table.items() if not isinstance(v, dict)}
+    for language, table in languages.items()
+}
+_context_strings = {
+    language: {k: v for k, v in table.items() if isinstance(v, dict)}
+    for language, table in languages.items()
+}
+_empty_table: dict = {}
+
+
+def _translate(context, string, ctx=None):
+    language = context.get("LANGUAGE", "en")
+    value = _plain_strings.get(language, _empty_table).get(string)
+
+    if value is not None:
+        return value
 
-    return value
+    contexts = _context_strings.get(language, _empty_table).get(string)
+
+    if contexts is None:
+        return string
+
+    return contexts.get(ctx, contexts)
 
 
 @pass_context
 def gettext(context, string):
-    language = context.get("LANGUAGE", "en")
-    value = languages.get(language, {}).get(string, string)
-    return _get_with_context(value)
+    return _translate(context, string)
 
 
 @pass_context
 def ngettext(context, s, p, n):
-    language = context.get("LANGUAGE", "en")
-
-    if n != 1:
-        value = languages.get(language, {}).get(p, p)
-        return _get_with_context(value)
-
-    value = languages.get(language, {}).get(s, s)
-    return _get_with_context(value)
+    return _translate(context, p if n != 1 else s)
 
 
 @pass_context
 def pgettext(context, c, s):
-    language = context.get("LANGUAGE", "en")
-    value = languages.get(language, {}).get(s, s)
-    return _get_with_context(value, c)
+    return _translate(context, s, c)
 
 
 @pass_context
 def npgettext(context, c, s, p, n):
-    language = context.get("LANGUAGE", "en")
+    return _translate(context, p if n != 1 else s, c)
 
-    if n != 1:
-        value = languages.get(language, {}).get(p, p)
-        return _get_with_context(value, c)
-
-    value = languages.get(language, {}).get(s, s)
-    return _get_with_context(value, c)
 
+gettext_globals = {
+    "_": gettext,
+    "gettext": gettext,
+    "ngettext": ngettext,
+    "pgettext": pgettext,
+    "npgettext": npgettext,
+}
 
 i18n_env = Environment(
-    loader=DictLoader(i18n_templates), extensions=["jinja2.ext.i18n"]
-)
-i18n_env.globals.update(
-    {
-        "_": gettext,
-        "gettext": gettext,
-        "ngettext": ngettext,
-        "pgettext": pgettext,
-        "npgettext": npgettext,
-    }
+    loader=DictLoader(i18n_templates),
+    extensions=["jinja2.ext.i18n"],
+    auto_reload=False,
 )
+i18n_env.globals.update(gettext_globals)
 i18n_env_trimmed = Environment(extensions=["jinja2.ext.i18n"])
 
 i18n_env_trimmed.policies["ext.i18n.trimmed"] = True
-i18n_env_trimmed.globals.update(
-    {
-        "_": gettext,
-        "gettext": gettext,
-        "ngettext": ngettext,
-        "pgettext": pgettext,
-        "npgettext": npgettext,
-    }
-)
+i18n_env_trimmed.globals.update(gettext_globals)
 
 newstyle_i18n_env = Environment(
-    loader=DictLoader(newstyle_i18n_templates), extensions=["jinja2.ext.i18n"]
+    loader=DictLoader(newstyle_i18n_templates),
+    extensions=["jinja2.ext.i18n"],
+    auto_reload=False,
 )
 newstyle_i18n_env.install_gettext_callables(  # type: ignore
     gettext, ngettext, newstyle=True, pgettext=pgettext, npgettext=npgettext
@@ -150,9 +150,10 @@ newstyle_i18n_env.install_gettext_callables(  # type: ignore
 
 
 class ExampleExtension(Extension):
-    tags = {"test"}
+    tags = frozenset({"test"})
     ext_attr = 42
     context_reference_node_cls = nodes.ContextReference
+    importable_object_path = f"{__name__}.importable_object"
 
     def parse(self, parser):
         return nodes.Output(
@@ -162,7 +163,7 @@ class ExampleExtension(Extension):
                     [
                         nodes.EnvironmentAttribute("sandboxed"),
                         self.attr("ext_attr"),
-                        nodes.ImportedName(__name__ + ".importable_object"),
+                        nodes.ImportedName(self.importable_object_path),
                         self.context_reference_node_cls(),
                     ],
                 )
@@ -170,9 +171,14 @@ class ExampleExtension(Extension):
         ).set_lineno(next(parser.stream).lineno)
 
     def _dump(self, sandboxed, ext_attr, imported_object, context):
-        return (
-            f"{sandboxed}|{ext_attr}|{imported_object}|{context.blocks}"
-            f"|{context.get('test_var')}"
+        return "|".join(
+            (
+                str(sandboxed),
+                str(ext_attr),
+                str(imported_object),
+                str(context.blocks),
+                str(context.get("test_var")),
+            )
         )
 
 
@@ -195,24 +201,22 @@ class StreamFilterExtension(Extension):
 
     def interpolate(self, token):
         pos = 0
-        end = len(token.value)
         lineno = token.lineno
-        while True:
-            match = _gettext_re.search(token.value, pos)
-            if match is None:
-                break
-            value = token.value[pos : match.start()]
+        for match in _gettext_re.finditer(token.value):
+            start, end = match.span()
+            value = token.value[pos:start]
             if value:
                 yield Token(lineno, "data", value)
-            lineno += count_newlines(token.value)
+                lineno += count_newlines(value)
             yield Token(lineno, "variable_begin", None)
             yield Token(lineno, "name", "gettext")
             yield Token(lineno, "lparen", None)
             yield Token(lineno, "string", match.group(1))
             yield Token(lineno, "rparen", None)
             yield Token(lineno, "variable_end", None)
-            pos = match.end()
-        if pos < end:
+            lineno += count_newlines(token.value[start:end])
+            pos = end
+        if pos < len(token.value):
             yield Token(lineno, "data", token.value[pos:])
 
 
@@ -293,6 +297,13 @@ class TestExtensions:
         out = tmpl.render()
         assert out == "Foo BAR Baz"
 
+    def test_streamfilter_extension_lineno(self):
+        env = Environment(extensions=[StreamFilterExtension])
+        ext = env.extensions[StreamFilterExtension.identifier]
+        token = Token(1, "data", "Foo\n_(bar)\nBaz _(qux)\n")
+        linenos = [t.lineno for t in ext.interpolate(token) if t.type == "string"]
+        assert linenos == [2, 3]
+
     def test_extension_ordering(self):
         class T1(Extension):
             priority = 1
@@ -486,7 +497,7 @@ class TestScope:
     def test_basic_scope_behavior(self):
         # This is what the old with statement compiled down to
         class ScopeExt(Extension):
-            tags = {"scope"}
+            tags = frozenset({"scope"})
 
             def parse(self, parser):
                 node = nodes.Scope(lineno=next(parser.stream).lineno)
@@ -711,7 +722,7 @@ class TestAutoEscape:
 
     def test_overlay_scopes(self):
         class MagicScopeExtension(Extension):
-            tags = {"overlay"}
+            tags = frozenset({"overlay"})
 
             def parse(self, parser):
                 node = nodes.OverlayScope(lineno=next(parser.stream).lineno)
@@ -5,6 +5,7 @@ from jinja2 import nodes
 from jinja2 import Template
 from jinja2 import TemplateSyntaxError
 from jinja2 import UndefinedError
+from jinja2.lexer import count_newlines
 from jinja2.lexer import Token
 from jinja2.lexer import TOKEN_BLOCK_BEGIN
 from jinja2.lexer import TOKEN_BLOCK_END
@@ -111,6 +112,20 @@ class TestLexer:
             next(stream)
             assert stream.current.type == expect
 
+    @pytest.mark.parametrize(
+        ("value", "expect"),
+        [
+            ("", 0),
+            ("abc", 0),
+            ("a\nb\nc", 2),
+            ("a\r\nb\r\n", 2),
+            ("a\rb\r", 2),
+            ("\n\r\r\n\r", 4),
+        ],
+    )
+    def test_count_newlines(self, value, expect):
+        assert count_newlines(value) == expect
+
     def test_normalizing(self, env):
         for seq in "\r", "\r\n", "\n":
             env = Environment(newline_sequence=seq)